@@ -4,142 +4,751 @@
 
 import logging
 import os
-import json
 import time
-import uuid
 import io
+import collections
+import struct
+from array import array
+import threading
+import uuid
+import warnings
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 import azure.functions as func
-from azure.storage.blob import BlobServiceClient, generate_blob_sas, BlobSasPermissions
+from azure.storage.blob import BlobServiceClient, BlobBlock, generate_container_sas, ContainerSasPermissions
 import requests
-from pydub import AudioSegment
+import orjson
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import av
+import azure.cognitiveservices.speech as speechsdk
+from blake3 import blake3
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore", DeprecationWarning)
+    try:
+        import audioop  # µ-law 변환용 C 구현 (Python 3.13에서 제거되어 없으면 변환표 사용)
+    except ImportError:
+        audioop = None
 
 from azure.core.credentials import AzureKeyCredential
+from azure.identity import DefaultAzureCredential
+from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
 from azure.ai.textanalytics import TextAnalyticsClient
 
 app = func.FunctionApp(http_auth_level=func.AuthLevel.ANONYMOUS)
 
+# 워커 프로세스가 재사용되는 동안 TLS 연결을 유지하기 위한 공용 HTTP 세션
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=32, max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])))
+
+# 이 길이(ms) 이하의 오디오는 Blob 업로드/배치 작업 없이 Speech SDK 스트리밍으로 바로 인식합니다.
+# (앱 설정 SHORT_AUDIO_MAX_SEC로 조정 가능, 기본 60초)
+SHORT_AUDIO_MAX_MS = int(float(os.environ.get('SHORT_AUDIO_MAX_SEC', '60')) * 1000)
+# 인식률을 높이고 싶은 사용자 지정 어휘
+CUSTOM_PHRASES = ["INFJ", "MBTI"]
+# Language 서비스 핵심 구절 추출 API가 한 요청에 허용하는 최대 문서 수
+KEY_PHRASE_BATCH_SIZE = 10
+# 배치 전사 작업 결과를 기다리는 최대 시간(초)
+STT_POLL_TIMEOUT_SEC = 600
+# Speech REST 호출의 (연결, 응답 읽기) 제한 시간(초). 멈춘 연결이 워커 스레드를 무한정 붙잡지 않도록 합니다.
+HTTP_TIMEOUT = (5, 30)
+# 디코딩된 PCM을 4MB 블록 단위로 Blob에 병렬로 올리며, 동시에 전송 중인 블록 수는 CPU 수 * 2를 8~32 범위로 제한
+PCM_CHUNK_SIZE = 4 * 1024 * 1024
+# 화자 구분이 없는 긴 오디오는 약 60초마다 (경계 앞 5초 안의) 가장 조용한 지점에서 잘라 여러 파일로 병렬 전사
+SEGMENT_SEC = 60
+SPLIT_SEARCH_SEC = 5
+UPLOAD_MAX_CONCURRENCY = min(32, max(8, (os.cpu_count() or 1) * 2))
+# 이보다 큰 요청은 읽거나 디코딩하지 않고 바로 거절 (앱 설정 MAX_UPLOAD_MB로 조정 가능, 기본 100MB)
+MAX_UPLOAD_BYTES = int(float(os.environ.get('MAX_UPLOAD_MB', '100')) * 1024 * 1024)
+# 디코딩을 시도할 오디오 컨테이너의 시작 바이트 (WAV, MP3(ID3), FLAC, Ogg/Opus, WebM, AIFF, CAF, AMR, WMA(ASF))
+AUDIO_MAGIC_PREFIXES = (b"RIFF", b"ID3", b"fLaC", b"OggS", b"\x1a\x45\xdf\xa3", b"FORM", b"caff", b"#!AMR", b"\x30\x26\xb2\x75\x8e\x66\xcf\x11")
+# 배치 전사용 업로드를 8bit µ-law WAV로 보내 업로드/다운로드 크기를 절반으로 줄입니다.
+# (인식 결과가 16bit PCM과 같은지 확인한 뒤 앱 설정 BATCH_AUDIO_MULAW=true로 켜기, 기본은 16bit PCM)
+BATCH_AUDIO_MULAW = os.environ.get('BATCH_AUDIO_MULAW', 'false').lower() == 'true'
+
+# 요약 작업과 핵심 구절 추출 요청처럼 서로 독립적인 네트워크 작업을 동시에 실행하기 위한 스레드 풀
+_EXECUTOR = ThreadPoolExecutor(max_workers=16)
+# Blob 블록 업로드 전용 스레드 풀 (대용량 업로드가 요약/결과 다운로드 작업의 스레드를 차지하지 않도록 분리)
+_UPLOAD_EXECUTOR = ThreadPoolExecutor(max_workers=UPLOAD_MAX_CONCURRENCY)
+
+# 요청마다 다시 만들지 않도록 워커 프로세스 시작 시 한 번만 생성하는 Azure SDK 클라이언트
+# STORAGE_ACCOUNT_URL이 설정되어 있으면 계정 키 대신 관리 ID로 접근하고 SAS는 사용자 위임 키로 서명합니다.
+try:
+    if 'STORAGE_ACCOUNT_URL' in os.environ:
+        _BLOB_SVC = BlobServiceClient(os.environ['STORAGE_ACCOUNT_URL'], credential=DefaultAzureCredential())
+        _ACCOUNT_KEY = None
+    else:
+        _BLOB_SVC = BlobServiceClient.from_connection_string(os.environ['STORAGE_CONNECTION_STRING'])
+        _ACCOUNT_KEY = _BLOB_SVC.credential.account_key
+    _LANG_CLIENT = TextAnalyticsClient(endpoint=os.environ['LANGUAGE_ENDPOINT'], credential=AzureKeyCredential(os.environ['LANGUAGE_KEY']))
+except KeyError as e:
+    logging.error("설정 오류: %s 환경 변수가 누락되었습니다.", e)
+    _BLOB_SVC = _ACCOUNT_KEY = _LANG_CLIENT = None
+
+# Speech 키/지역과 배치 전사 엔드포인트/헤더는 요청마다 다시 만들지 않고 워커 시작 시 한 번만 준비합니다.
+try:
+    _SPEECH_KEY = os.environ['SPEECH_KEY']
+    _SPEECH_REGION = os.environ['SPEECH_REGION']
+    _SPEECH_ENDPOINT = f"https://{_SPEECH_REGION}.api.cognitive.microsoft.com/speechtotext/v3.2/transcriptions"
+    _SPEECH_HEADERS = {'Ocp-Apim-Subscription-Key': _SPEECH_KEY, 'Content-Type': 'application/json'}
+except KeyError as e:
+    logging.error("설정 오류: %s 환경 변수가 누락되었습니다.", e)
+    _SPEECH_KEY = _SPEECH_REGION = _SPEECH_ENDPOINT = _SPEECH_HEADERS = None
+
+# 요청마다 SAS를 서명하지 않도록 audio-files 컨테이너 SAS(2시간 유효)를 캐시합니다.
+# 대기열에 있던 작업이 나중에 오디오를 읽을 수 있도록, 남은 시간이 업로드 여유(30분) + 전사 대기 시간보다 짧아지면 다시 서명
+CONTAINER_SAS_LIFETIME = timedelta(hours=2)
+CONTAINER_SAS_MIN_REMAINING = timedelta(minutes=30, seconds=STT_POLL_TIMEOUT_SEC)
+_CONTAINER_SAS = None
+_CONTAINER_SAS_EXPIRY = datetime.min
+_CONTAINER_SAS_LOCK = threading.Lock()
+# 사용자 위임 키는 최대 7일까지 유효하므로 6일짜리 키를 받아 두고 만료 1일 전에 새로 받습니다.
+# (위임 키로 서명한 SAS는 키 만료 이후까지 유효할 수 없으므로 SAS 유효 기간보다 넉넉히 남겨 둠)
+_DELEGATION_KEY = None
+_DELEGATION_KEY_EXPIRY = datetime.min
+
+# 전사가 끝난 업로드 Blob을 모아 두었다가 백그라운드 스레드에서 주기적으로 일괄 삭제
+# (같은 오디오라도 이미 올라간 Blob을 If-None-Match로 재사용하지 않습니다. 앞선 요청이 같은 이름을 이미 이 대기열에
+#  넣었을 수 있어, 재사용한 Blob이 Speech 서비스가 읽기 전에 지워질 수 있기 때문입니다)
+BLOB_DELETE_INTERVAL_SEC = 60
+BLOB_DELETE_BATCH_SIZE = 256  # Blob Batch API 한 요청의 최대 하위 요청 수
+_PENDING_BLOB_DELETES = collections.deque()
+
+# 같은 오디오를 다시 올리면 변환/요약을 반복하지 않도록 최종 응답을 콘텐츠 해시로 캐시
+# (워커 메모리의 LRU + 워커 간 공유를 위한 Blob 저장소)
+# 사용자 오디오의 전사/요약을 무기한 보관하지 않도록 RESPONSE_CACHE_TTL_HOURS(기본 24시간)가 지난 항목은 쓰지 않습니다.
+# Blob 자체는 transcription-cache 컨테이너의 수명 주기 관리 규칙으로 삭제합니다. (README 참고)
+RESPONSE_CACHE_SIZE = 256
+RESPONSE_CACHE_TTL_SEC = int(float(os.environ.get('RESPONSE_CACHE_TTL_HOURS', '24')) * 3600)
+RESPONSE_CACHE_CONTAINER = 'transcription-cache'
+_RESPONSE_CACHE = collections.OrderedDict()
+_RESPONSE_CACHE_LOCK = threading.Lock()
+
 @app.route(route="UploadAndTranscribe", methods=["POST"])
 def upload_and_transcribe(req: func.HttpRequest) -> func.HttpResponse:
-    logging.info('Python HTTP trigger function: "UploadAndTranscribe"가 요청을 받았습니다.')
+    logging.debug('Python HTTP trigger function: "UploadAndTranscribe"가 요청을 받았습니다.')
 
-    # --- 환경 변수 로드 ---
-    try:
-        speech_key = os.environ['SPEECH_KEY']
-        speech_region = os.environ['SPEECH_REGION']
-        conn_str = os.environ['STORAGE_CONNECTION_STRING']
-        language_key = os.environ['LANGUAGE_KEY']
-        language_endpoint = os.environ['LANGUAGE_ENDPOINT']
-    except KeyError as e:
-        return func.HttpResponse(json.dumps({"error": f"설정 오류: {e} 환경 변수가 누락되었습니다."}), status_code=500, mimetype="application/json")
-
-    # --- FFmpeg 설정 ---
-    try:
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        ffmpeg_path = os.path.join(script_dir, 'bin', 'ffmpeg.exe')
-        ffprobe_path = os.path.join(script_dir, 'bin', 'ffprobe.exe')
-        if not os.path.exists(ffmpeg_path) or not os.path.exists(ffprobe_path):
-            raise FileNotFoundError("api/bin 폴더에 ffmpeg.exe 또는 ffprobe.exe 파일이 없습니다.")
-        AudioSegment.converter = ffmpeg_path
-        AudioSegment.ffprobe = ffprobe_path
-    except Exception as ffmpeg_e:
-        return func.HttpResponse(json.dumps({"error": f"서버 환경 설정 오류 (FFmpeg): {str(ffmpeg_e)}"}), status_code=500, mimetype="application/json")
+    # --- 환경 변수 확인 (값은 워커 시작 시 읽어 둠) ---
+    if _SPEECH_KEY is None:
+        return func.HttpResponse(orjson.dumps({"error": "설정 오류: SPEECH_KEY 또는 SPEECH_REGION 환경 변수가 누락되었습니다."}), status_code=500, mimetype="application/json; charset=utf-8")
+    if _BLOB_SVC is None or _LANG_CLIENT is None:
+        return func.HttpResponse(orjson.dumps({"error": "설정 오류: Storage 또는 Language 환경 변수가 누락되었습니다."}), status_code=500, mimetype="application/json; charset=utf-8")
 
     # --- 1. 파일 업로드 및 오디오 변환 ---
     try:
+        # 너무 큰 요청과 오디오가 아닌 파일은 해시/디코딩/업로드 전에 거절합니다.
+        if len(req.get_body()) > MAX_UPLOAD_BYTES:
+            return func.HttpResponse(orjson.dumps({"error": f"파일이 너무 큽니다. (최대 {MAX_UPLOAD_BYTES // (1024 * 1024)}MB)"}), status_code=413, mimetype="application/json; charset=utf-8")
         file = req.files.get('file')
-        if not file: return func.HttpResponse(json.dumps({"error": "요청에 파일이 포함되지 않았습니다."}), status_code=400, mimetype="application/json")
-        file_bytes = file.stream.read()
-        audio = AudioSegment.from_file(io.BytesIO(file_bytes))
-        audio = audio.set_frame_rate(16000).set_channels(1)
-        wav_buffer = io.BytesIO()
-        audio.export(wav_buffer, format="wav")
-        wav_buffer.seek(0)
+        if not file: return func.HttpResponse(orjson.dumps({"error": "요청에 파일이 포함되지 않았습니다."}), status_code=400, mimetype="application/json; charset=utf-8")
+        header = file.stream.read(16)
+        file.stream.seek(0)
+        if not is_audio_header(header):
+            return func.HttpResponse(orjson.dumps({"error": "지원하지 않는 파일 형식입니다."}), status_code=415, mimetype="application/json; charset=utf-8")
+        # 화자 구분과 단어 단위 타임스탬프는 요청한 경우에만 사용 (Speech 서비스 처리 시간과 결과 크기 절감)
+        diarize = get_bool_option(req, "diarize")
+        word_timestamps = get_bool_option(req, "wordTimestamps")
+        # 업로드 파일 전체를 bytes로 복사하지 않고 file.stream을 조각 단위로 읽어 해시/디코딩합니다.
+        audio_stream = file.stream
+        # BLAKE3는 SIMD와 멀티스레드(트리 해시)로 큰 파일도 빠르게 해시합니다. 캐시 키와 Blob 이름 앞부분에 사용
+        audio_digest = hash_stream(audio_stream)
+        cache_key = f"{audio_digest}-{int(diarize)}{int(word_timestamps)}"
+        cached_body = get_cached_response(cache_key)
+        if cached_body is not None:
+            return func.HttpResponse(cached_body, status_code=200, mimetype="application/json; charset=utf-8")
+        compliant_wav = read_compliant_wav_pcm(audio_stream)
+        if compliant_wav is not None:
+            pcm_chunks, sample_rate = compliant_wav
+        else:
+            # 이미 16kHz(전화 음질은 8kHz)/16bit/mono PCM WAV가 아닌 경우에만 디코딩/리샘플링 수행
+            audio_stream.seek(0)
+            pcm_chunks, sample_rate = decode_to_pcm_chunks(audio_stream)
+        # 짧은 오디오 기준 길이만큼만 먼저 디코딩해 보고 스트리밍/배치 경로를 결정합니다.
+        # 나머지는 배치 경로에서 업로드와 겹쳐서 디코딩됩니다.
+        short_audio_max_bytes = SHORT_AUDIO_MAX_MS * sample_rate * 2 // 1000
+        head_chunks = []
+        head_size = 0
+        for chunk in pcm_chunks:
+            head_chunks.append(chunk)
+            head_size += len(chunk)
+            if head_size > short_audio_max_bytes:
+                break
+        use_streaming = head_size <= short_audio_max_bytes
     except Exception as audio_e:
-        return func.HttpResponse(json.dumps({"error": "오디오 파일을 처리할 수 없습니다."}), status_code=400, mimetype="application/json")
+        return func.HttpResponse(orjson.dumps({"error": "오디오 파일을 처리할 수 없습니다."}), status_code=400, mimetype="application/json; charset=utf-8")
 
     # --- 2. STT(음성 텍스트 변환) 수행 ---
     try:
-        blob_service_client = BlobServiceClient.from_connection_string(conn_str)
-        blob_name = f"{str(uuid.uuid4())}.wav"
-        blob_client = blob_service_client.get_blob_client(container='audio-files', blob=blob_name)
-        blob_client.upload_blob(wav_buffer, overwrite=True)
-        sas_token = generate_blob_sas(account_name=blob_service_client.account_name, container_name='audio-files', blob_name=blob_name, account_key=blob_service_client.credential.account_key, permission=BlobSasPermissions(read=True), expiry=datetime.utcnow() + timedelta(hours=1))
-        sas_url = f"{blob_client.url}?{sas_token}"
-        
-        stt_endpoint = f"https://{speech_region}.api.cognitive.microsoft.com/speechtotext/v3.2/transcriptions"
-        headers = {'Ocp-Apim-Subscription-Key': speech_key, 'Content-Type': 'application/json'}
-        
-        # ★★★ STT 정확도 향상을 위한 사용자 지정 어휘 추가 ★★★
-        body = {
-            "contentUrls": [sas_url], 
-            "locale": "ko-KR", 
-            "displayName": "Advanced Transcription", 
-            "properties": {
-                "wordLevelTimestampsEnabled": True, 
-                "diarizationEnabled": True,
-                "phrases": "INFJ;MBTI"  # 인식률을 높이고 싶은 단어를 세미콜론(;)으로 구분하여 추가
-            }
-        }
-
-        response = requests.post(stt_endpoint, headers=headers, json=body)
-        if response.status_code != 201: raise Exception(f"Speech API 오류: {response.text}")
-        
-        transcription_url = response.headers['Location']
-        transcription_result = poll_for_stt_result(transcription_url, headers)
+        if use_streaming:
+            # 짧은 오디오는 WebSocket 스트리밍 인식으로 처리 (Blob 업로드, SAS, 배치 작업 폴링 생략)
+            transcription_result = transcribe_short_audio(head_chunks, sample_rate, diarize, word_timestamps)
+        else:
+            pcm_stream = chain(head_chunks, pcm_chunks)
+            # 같은 파일을 동시에 (다른 옵션으로) 요청해도 서로의 Blob을 덮어쓰거나 지우지 않도록 요청마다 고유한 이름을 씁니다.
+            blob_prefix = f"{audio_digest}-{uuid.uuid4().hex}"
+            blob_names = []
+            try:
+                if diarize:
+                    # 화자 번호는 파일마다 따로 매겨지므로 화자 구분 시에는 하나의 파일로 전사
+                    blob_names.append(f"{blob_prefix}.wav")
+                    sas_url, upload_future = upload_wav_to_blob(blob_names[0], pcm_stream, sample_rate)
+                    segments, upload_futures = [(sas_url, 0)], [upload_future]
+                else:
+                    segments, upload_futures = upload_wav_segments(blob_prefix, pcm_stream, sample_rate, blob_names)
+                transcription_result = transcribe_batch(segments, upload_futures, diarize, word_timestamps)
+            finally:
+                # 전사가 끝난(또는 실패한) Blob은 응답을 늦추지 않도록 백그라운드에서 삭제
+                _PENDING_BLOB_DELETES.extend(blob_names)
         if not transcription_result: raise Exception("STT 작업 시간 초과 또는 실패")
 
     except Exception as stt_e:
-        return func.HttpResponse(json.dumps({"error": str(stt_e)}), status_code=500, mimetype="application/json")
+        return func.HttpResponse(orjson.dumps({"error": str(stt_e)}), status_code=500, mimetype="application/json; charset=utf-8")
 
     # --- 3. Language 서비스로 요약 및 핵심 구절 추출 ---
     try:
-        text_analytics_client = TextAnalyticsClient(endpoint=language_endpoint, credential=AzureKeyCredential(language_key))
         phrases = transcription_result.get("recognizedPhrases", [])
         full_text_for_summary = " ".join([p.get("nBest", [{}])[0].get("display", "") for p in phrases])
 
-        # ★★★ '추상적 요약'으로 변경 및 길이 제어 ★★★
-        summary = ""
-        if full_text_for_summary.strip():
-            poller = text_analytics_client.begin_abstract_summary(documents=[full_text_for_summary], sentence_count=3)
-            summary_results = poller.result()
-            for result in summary_results:
+        # 각 문장의 핵심 구절 추출 (문장마다 요청하지 않고 최대 10개 문서씩 묶어서 요청)
+        # "네.", "음.." 처럼 반복되는 문장은 한 번만 보내고 결과를 같은 문장 전체에 나눠 줍니다.
+        phrase_indexes_by_text = {}
+        for i, phrase in enumerate(phrases):
+            phrase["key_phrases"] = []
+            display_text = phrase.get("nBest", [{}])[0].get("display", "").strip()
+            if display_text:
+                phrase_indexes_by_text.setdefault(display_text, []).append(i)
+        unique_texts = list(phrase_indexes_by_text)
+        key_phrase_docs = [{"id": str(i), "language": "ko", "text": text} for i, text in enumerate(unique_texts)]
+
+        # 요약 작업(LRO 폴링)과 핵심 구절 배치 요청들을 스레드 풀에서 동시에 실행
+        summary_future = _EXECUTOR.submit(summarize_text, full_text_for_summary)
+        key_phrase_futures = [
+            _EXECUTOR.submit(_LANG_CLIENT.extract_key_phrases, documents=key_phrase_docs[start:start + KEY_PHRASE_BATCH_SIZE])
+            for start in range(0, len(key_phrase_docs), KEY_PHRASE_BATCH_SIZE)
+        ]
+        for future in key_phrase_futures:
+            for result in future.result():
                 if not result.is_error:
-                    summary = " ".join([s.text for s in result.summaries])
-                    break
-        
-        # 각 문장의 핵심 구절 추출
-        for phrase in phrases:
-            display_text = phrase.get("nBest", [{}])[0].get("display", "")
-            if display_text.strip():
-                key_phrases_result = text_analytics_client.extract_key_phrases(documents=[display_text])
-                phrase["key_phrases"] = key_phrases_result[0].key_phrases if not key_phrases_result[0].is_error else []
-            else:
-                phrase["key_phrases"] = []
+                    for i in phrase_indexes_by_text[unique_texts[int(result.id)]]:
+                        phrases[i]["key_phrases"] = result.key_phrases
+        summary = summary_future.result()
 
         final_response = {"summary": summary, "recognizedPhrases": phrases}
-        return func.HttpResponse(json.dumps(final_response, ensure_ascii=False), status_code=200, mimetype="application/json; charset=utf-8")
+        response_body = orjson.dumps(final_response)
+        store_cached_response(cache_key, response_body)
+        return func.HttpResponse(response_body, status_code=200, mimetype="application/json; charset=utf-8")
 
     except Exception as lang_e:
-        return func.HttpResponse(json.dumps(transcription_result, ensure_ascii=False), status_code=200, mimetype="application/json; charset=utf-8")
+        return func.HttpResponse(orjson.dumps(transcription_result), status_code=200, mimetype="application/json; charset=utf-8")
+
+
+# 캐시된 응답을 워커 메모리에서 먼저 찾고, 없으면 Blob 저장소에서 찾습니다.
+def get_cached_response(cache_key: str):
+    with _RESPONSE_CACHE_LOCK:
+        entry = _RESPONSE_CACHE.get(cache_key)
+        if entry is not None:
+            body, stored_at = entry
+            if time.time() - stored_at < RESPONSE_CACHE_TTL_SEC:
+                _RESPONSE_CACHE.move_to_end(cache_key)
+                return body
+            del _RESPONSE_CACHE[cache_key]
+    try:
+        downloader = _BLOB_SVC.get_blob_client(container=RESPONSE_CACHE_CONTAINER, blob=f"{cache_key}.json").download_blob()
+        stored_at = downloader.properties.last_modified.timestamp()
+        if time.time() - stored_at >= RESPONSE_CACHE_TTL_SEC:
+            return None
+        body = downloader.readall()
+    except ResourceNotFoundError:
+        return None
+    except Exception as cache_e:
+        logging.warning("응답 캐시 조회 실패: %s", cache_e)
+        return None
+    remember_response(cache_key, body, stored_at)
+    return body
+
+
+def remember_response(cache_key: str, body: bytes, stored_at: float):
+    with _RESPONSE_CACHE_LOCK:
+        _RESPONSE_CACHE[cache_key] = (body, stored_at)
+        _RESPONSE_CACHE.move_to_end(cache_key)
+        while len(_RESPONSE_CACHE) > RESPONSE_CACHE_SIZE:
+            _RESPONSE_CACHE.popitem(last=False)
+
+
+# 응답을 메모리 캐시에 넣고, Blob 저장은 응답을 늦추지 않도록 백그라운드에서 수행합니다.
+def store_cached_response(cache_key: str, body: bytes):
+    remember_response(cache_key, body, time.time())
+    _EXECUTOR.submit(persist_cached_response, cache_key, body)
+
+
+def persist_cached_response(cache_key: str, body: bytes):
+    blob_client = _BLOB_SVC.get_blob_client(container=RESPONSE_CACHE_CONTAINER, blob=f"{cache_key}.json")
+    try:
+        try:
+            blob_client.upload_blob(body, overwrite=True)
+        except ResourceNotFoundError:
+            # 캐시 컨테이너가 아직 없으면 만들고 한 번 더 시도합니다.
+            try:
+                _BLOB_SVC.create_container(RESPONSE_CACHE_CONTAINER)
+            except ResourceExistsError:
+                pass
+            blob_client.upload_blob(body, overwrite=True)
+    except Exception as cache_e:
+        logging.warning("응답 캐시 저장 실패: %s", cache_e)
+
+
+# ★★★ '추상적 요약'으로 변경 및 길이 제어 ★★★
+def summarize_text(text: str) -> str:
+    if not text.strip():
+        return ""
+    poller = _LANG_CLIENT.begin_abstract_summary(documents=[text], sentence_count=3)
+    for result in poller.result():
+        if not result.is_error:
+            return " ".join([s.text for s in result.summaries])
+    return ""
+
+
+# 쿼리 문자열 또는 폼 필드의 "true"/"false" 옵션을 읽습니다. (기본값 False)
+def get_bool_option(req: func.HttpRequest, name: str) -> bool:
+    value = req.params.get(name) or req.form.get(name) or "false"
+    return value.lower() == "true"
+
+
+# 파일 앞부분의 시그니처로 디코딩을 시도할 만한 오디오 파일인지 판단합니다.
+def is_audio_header(header: bytes) -> bool:
+    if header.startswith(AUDIO_MAGIC_PREFIXES):
+        return True
+    if header[4:8] == b"ftyp":  # MP4/M4A/3GP
+        return True
+    # 태그 없는 MP3 또는 ADTS AAC 프레임 동기 비트(11bit)
+    return len(header) >= 2 and header[0] == 0xFF and header[1] & 0xE0 == 0xE0
+
+
+# 업로드된 파일이 이미 16kHz(또는 8kHz)/16bit/mono PCM WAV이면 (data 청크를 PCM 조각으로 읽는 생성기, 샘플레이트)를, 아니면 None을 반환합니다.
+def read_compliant_wav_pcm(stream):
+    riff = stream.read(12)
+    if len(riff) < 12 or riff[0:4] != b"RIFF" or riff[8:12] != b"WAVE":
+        return None
+    # fmt 청크 앞에 JUNK, 뒤에 LIST 등 다른 청크가 있을 수 있으므로 청크를 차례로 살펴봅니다.
+    sample_rate = None
+    while True:
+        chunk_header = stream.read(8)
+        if len(chunk_header) < 8:
+            return None
+        chunk_id, chunk_size = struct.unpack("<4sI", chunk_header)
+        if chunk_id == b"fmt ":
+            fmt = stream.read(chunk_size)
+            if len(fmt) < 16:
+                return None
+            audio_format, channels, rate = struct.unpack_from("<HHI", fmt, 0)
+            bits_per_sample = struct.unpack_from("<H", fmt, 14)[0]
+            if audio_format == 0xFFFE and len(fmt) >= 26:  # WAVE_FORMAT_EXTENSIBLE: SubFormat GUID 앞 2바이트가 실제 형식
+                audio_format = struct.unpack_from("<H", fmt, 24)[0]
+            if (audio_format, channels, bits_per_sample) != (1, 1, 16) or rate not in (8000, 16000):
+                return None
+            sample_rate = rate
+            stream.seek(chunk_size & 1, io.SEEK_CUR)
+        elif chunk_id == b"data":
+            if sample_rate is None:
+                return None
+            if chunk_size in (0, 0xFFFFFFFF):  # 녹음 중에 쓰인 파일은 data 크기가 비어 있으므로 파일 끝까지 읽습니다.
+                data_start = stream.tell()
+                chunk_size = stream.seek(0, io.SEEK_END) - data_start
+                stream.seek(data_start)
+            return iter_stream_chunks(stream, chunk_size, PCM_CHUNK_SIZE), sample_rate
+        else:
+            stream.seek(chunk_size + (chunk_size & 1), io.SEEK_CUR)
+
+
+# 업로드 파일을 조각 단위로 읽으며 BLAKE3 해시를 계산하고, 이후 디코딩을 위해 처음 위치로 되돌립니다.
+def hash_stream(stream) -> str:
+    hasher = blake3(max_threads=blake3.AUTO)
+    for chunk in iter(lambda: stream.read(PCM_CHUNK_SIZE), b""):
+        hasher.update(chunk)
+    stream.seek(0)
+    return hasher.hexdigest(length=16)
+
+
+# 오디오 파일을 PyAV(libavcodec + libswresample)로 프로세스 내에서 디코딩/리샘플링하는
+# 16bit mono PCM 조각(약 4MB) 생성기와 샘플레이트를 반환합니다.
+# 원본이 8kHz 이하(전화 음질)이면 16kHz로 올려도 정보가 늘지 않으므로 8kHz로, 그 외에는 16kHz로 맞춥니다.
+def decode_to_pcm_chunks(audio_file):
+    container = av.open(audio_file)
+    stream = container.streams.audio[0]
+    # 핸들러는 이미 Functions 워커의 스레드 풀에서 실행되므로, 디코더가 지원하면 libavcodec 내부 스레드도 함께 사용합니다.
+    stream.codec_context.thread_type = "AUTO"
+    target_rate = 8000 if stream.rate <= 8000 else 16000
+    return iter_resampled_pcm(container, stream, target_rate), target_rate
+
+
+def iter_resampled_pcm(container, stream, target_rate: int):
+    resampler = av.AudioResampler(format='s16', layout='mono', rate=target_rate)
+    buffer = bytearray()
+    with container:
+        for frame in chain(container.decode(stream), [None]):  # 마지막 None은 리샘플러에 남은 샘플을 비웁니다.
+            for out in resampler.resample(frame):
+                buffer += memoryview(out.planes[0])[:out.samples * 2]
+                if len(buffer) >= PCM_CHUNK_SIZE:
+                    yield bytes(buffer)
+                    buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+# 16bit/mono PCM을 Speech SDK로 스트리밍 인식하여 배치 결과와 같은 형식으로 반환합니다.
+def transcribe_short_audio(pcm_chunks: list, sample_rate: int, diarize: bool, word_timestamps: bool) -> dict:
+    speech_config = speechsdk.SpeechConfig(subscription=_SPEECH_KEY, region=_SPEECH_REGION)
+    speech_config.speech_recognition_language = "ko-KR"
+    if word_timestamps:
+        # 단어별 시간은 상세 출력(NBest[].Words)에만 포함됩니다.
+        speech_config.request_word_level_timestamps()
+        speech_config.output_format = speechsdk.OutputFormat.Detailed
+    stream_format = speechsdk.audio.AudioStreamFormat(samples_per_second=sample_rate, bits_per_sample=16, channels=1)
+    push_stream = speechsdk.audio.PushAudioInputStream(stream_format=stream_format)
+    audio_config = speechsdk.audio.AudioConfig(stream=push_stream)
+    # 화자 구분이 필요할 때만 ConversationTranscriber를, 그 외에는 더 가벼운 SpeechRecognizer를 사용
+    if diarize:
+        transcriber = speechsdk.transcription.ConversationTranscriber(speech_config=speech_config, audio_config=audio_config)
+    else:
+        transcriber = speechsdk.SpeechRecognizer(speech_config=speech_config, audio_config=audio_config)
+    phrase_list = speechsdk.PhraseListGrammar.from_recognizer(transcriber)
+    for custom_phrase in CUSTOM_PHRASES:
+        phrase_list.addPhrase(custom_phrase)
+
+    phrases = []
+    errors = []
+    done = threading.Event()
+
+    def on_transcribed(evt):
+        result = evt.result
+        if result.reason == speechsdk.ResultReason.RecognizedSpeech and result.text:
+            speaker_id = (result.speaker_id or "") if diarize else ""
+            n_best = {"display": result.text}
+            if word_timestamps:
+                detailed = orjson.loads(result.json).get("NBest") or [{}]
+                n_best["words"] = [
+                    {"word": w["Word"], "offsetInTicks": w["Offset"], "durationInTicks": w["Duration"]}
+                    for w in detailed[0].get("Words", [])
+                ]
+            phrases.append({
+                "recognitionStatus": "Success",
+                "speaker": int(speaker_id.rsplit("-", 1)[-1]) if speaker_id.startswith("Guest-") else 0,
+                "offsetInTicks": result.offset,
+                "durationInTicks": result.duration,
+                "nBest": [n_best],
+            })
+
+    def on_canceled(evt):
+        if evt.cancellation_details.reason == speechsdk.CancellationReason.Error:
+            errors.append(evt.cancellation_details.error_details)
+        done.set()
+
+    if diarize:
+        transcriber.transcribed.connect(on_transcribed)
+        start, stop = transcriber.start_transcribing_async, transcriber.stop_transcribing_async
+    else:
+        transcriber.recognized.connect(on_transcribed)
+        start, stop = transcriber.start_continuous_recognition_async, transcriber.stop_continuous_recognition_async
+    transcriber.canceled.connect(on_canceled)
+    transcriber.session_stopped.connect(lambda evt: done.set())
+
+    start().get()
+    for chunk in pcm_chunks:
+        push_stream.write(chunk)
+    push_stream.close()
+    finished = done.wait(timeout=300)
+    stop().get()
+
+    if errors: raise Exception(f"Speech SDK 오류: {errors[0]}")
+    # 세션 종료/취소 신호 없이 시간이 지나면 일부만 인식된 결과를 성공으로 돌려주지 않습니다.
+    if not finished: raise Exception("Speech SDK 인식 시간 초과")
+    return {"recognizedPhrases": phrases}
 
 
-def poll_for_stt_result(url: str, headers: dict) -> dict:
-    poll_count = 0
-    while poll_count < 30:
-        time.sleep(10)
-        res = requests.get(url, headers=headers)
-        data = res.json()
+# mono 오디오 데이터 앞에 붙일 WAV(RIFF) 헤더를 만듭니다. (16bit PCM은 44바이트, 8bit µ-law는 46바이트)
+def build_wav_header(data_size: int, sample_rate: int, mulaw: bool = False) -> bytes:
+    if mulaw:
+        # PCM이 아닌 형식(7 = WAVE_FORMAT_MULAW)의 fmt 청크는 cbSize(0)까지 18바이트
+        fmt = struct.pack("<HHIIHHH", 7, 1, sample_rate, sample_rate, 1, 8, 0)
+    else:
+        fmt = struct.pack("<HHIIHH", 1, 1, sample_rate, sample_rate * 2, 2, 16)
+    riff_size = 4 + 8 + len(fmt) + 8 + data_size
+    return struct.pack("<4sI4s4sI", b"RIFF", riff_size, b"WAVE", b"fmt ", len(fmt)) + fmt + struct.pack("<4sI", b"data", data_size)
+
+
+# G.711 µ-law 변환표: 16bit 샘플(부호 없는 값으로 읽은 인덱스) → µ-law 바이트
+def build_mulaw_table() -> bytes:
+    seg_ends = (0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF)
+    table = bytearray(65536)
+    for index in range(65536):
+        sample = (index - 65536 if index >= 32768 else index) >> 2
+        sample, mask = (-sample, 0x7F) if sample < 0 else (sample, 0xFF)
+        sample = min(sample, 8159) + 0x21
+        seg = next((i for i, end in enumerate(seg_ends) if sample <= end), 8)
+        table[index] = (0x7F if seg == 8 else (seg << 4) | ((sample >> (seg + 1)) & 0x0F)) ^ mask
+    return bytes(table)
+
+
+_MULAW_TABLE = build_mulaw_table() if BATCH_AUDIO_MULAW and audioop is None else None
+
+
+# 배치 전사용으로 올릴 PCM 조각을 설정에 따라 µ-law로 변환합니다. 업로드 스레드에서 호출됩니다.
+def encode_batch_audio(pcm: bytes) -> bytes:
+    if not BATCH_AUDIO_MULAW:
+        return pcm
+    pcm = memoryview(pcm)[:len(pcm) & ~1]
+    if audioop is not None:
+        return audioop.lin2ulaw(pcm, 2)
+    return bytes(map(_MULAW_TABLE.__getitem__, pcm.cast('H')))
+
+
+# 변환 후 크기 (µ-law는 샘플당 1바이트)
+def batch_audio_size(pcm_size: int) -> int:
+    return pcm_size // 2 if BATCH_AUDIO_MULAW else pcm_size
+
+
+# 파일 객체에서 최대 size 바이트를 chunk_size 단위로 읽어 돌려줍니다.
+def iter_stream_chunks(stream, size: int, chunk_size: int):
+    while size > 0:
+        chunk = stream.read(min(chunk_size, size))
+        if not chunk:
+            break
+        size -= len(chunk)
+        yield chunk
+
+
+# PCM 조각을 생성되는 대로 Blob 블록으로 올리고(디코딩과 업로드가 겹침), 마지막에 전체 길이로 만든 WAV 헤더를
+# 맨 앞 블록으로 커밋합니다. Speech 서비스가 읽을 수 있는 SAS URL과, 남은 업로드/커밋이 끝나면 완료되는 Future를 반환합니다.
+def upload_wav_to_blob(blob_name: str, pcm_chunks, sample_rate: int):
+    blob_client = _BLOB_SVC.get_blob_client(container='audio-files', blob=blob_name)
+    in_flight = threading.BoundedSemaphore(UPLOAD_MAX_CONCURRENCY)
+    futures = []
+    block_ids = []
+    data_size = 0
+    for i, chunk in enumerate(pcm_chunks, start=1):
+        block_id = f"{i:08d}"
+        futures.append(submit_upload(in_flight, stage_batch_block, blob_client, block_id, chunk))
+        block_ids.append(block_id)
+        data_size += batch_audio_size(len(chunk))
+    header_id = f"{0:08d}"
+
+    def commit():
+        blob_client.stage_block(block_id=header_id, data=build_wav_header(data_size, sample_rate, BATCH_AUDIO_MULAW))
+        for future in futures:
+            future.result()
+        blob_client.commit_block_list([BlobBlock(block_id=block_id) for block_id in [header_id] + block_ids])
+
+    return f"{blob_client.url}?{get_container_sas()}", _EXECUTOR.submit(commit)
+
+
+# PCM 조각을 약 SEGMENT_SEC 길이의 구간으로 나누어 각각 WAV Blob으로 병렬 업로드하고,
+# 구간별 (SAS URL, 시작 위치(100ns 틱)) 목록과 아직 진행 중인 업로드 Future 목록을 반환합니다.
+# 업로드한 Blob 이름은 blob_names에 추가합니다.
+def upload_wav_segments(blob_prefix: str, pcm_chunks, sample_rate: int, blob_names: list):
+    in_flight = threading.BoundedSemaphore(UPLOAD_MAX_CONCURRENCY)
+    segments = []
+    futures = []
+    offset_bytes = 0
+    for i, segment in enumerate(iter_pcm_segments(pcm_chunks, sample_rate)):
+        blob_name = f"{blob_prefix}-{i:04d}.wav"
+        blob_names.append(blob_name)
+        blob_client = _BLOB_SVC.get_blob_client(container='audio-files', blob=blob_name)
+        futures.append(submit_upload(in_flight, upload_wav_segment, blob_client, segment, sample_rate))
+        segments.append((f"{blob_client.url}?{get_container_sas()}", offset_bytes * 10_000_000 // (sample_rate * 2)))
+        offset_bytes += len(segment)
+    return segments, futures
+
+
+# µ-law 변환은 요청 스레드의 디코딩/분할을 늦추지 않도록 업로드 스레드에서 수행합니다.
+def stage_batch_block(blob_client, block_id: str, pcm: bytes):
+    blob_client.stage_block(block_id=block_id, data=encode_batch_audio(pcm))
+
+
+def upload_wav_segment(blob_client, pcm: bytes, sample_rate: int):
+    audio = encode_batch_audio(pcm)
+    blob_client.upload_blob(build_wav_header(len(audio), sample_rate, BATCH_AUDIO_MULAW) + audio, overwrite=True)
+
+
+# 업로드 작업을 전용 스레드 풀에 넘기되, 아직 끝나지 않은 작업(= 메모리에 남아 있는 데이터) 수를 in_flight로 제한합니다.
+def submit_upload(in_flight: threading.BoundedSemaphore, fn, *args):
+    in_flight.acquire()
+
+    def run():
+        try:
+            return fn(*args)
+        finally:
+            in_flight.release()
+
+    return _UPLOAD_EXECUTOR.submit(run)
+
+
+def iter_pcm_segments(pcm_chunks, sample_rate: int):
+    segment_bytes = SEGMENT_SEC * sample_rate * 2
+    search_bytes = SPLIT_SEARCH_SEC * sample_rate * 2
+    buffer = bytearray()
+    for chunk in pcm_chunks:
+        buffer += chunk
+        while len(buffer) >= segment_bytes:
+            split = find_quietest_frame(buffer, segment_bytes - search_bytes, segment_bytes, sample_rate)
+            yield bytes(buffer[:split])
+            del buffer[:split]
+    if buffer:
+        yield bytes(buffer)
+
+
+# buffer[start:end] 구간을 100ms 프레임으로 나누어 에너지(제곱합)가 가장 작은 프레임의 시작 위치(바이트)를 반환합니다.
+def find_quietest_frame(buffer: bytearray, start: int, end: int, sample_rate: int) -> int:
+    frame_bytes = sample_rate * 2 // 10
+    samples = array('h', buffer[start:end])
+    frame_samples = frame_bytes // 2
+    best_pos, best_energy = end, None
+    for i in range(0, len(samples) - frame_samples + 1, frame_samples):
+        energy = sum(x * x for x in samples[i:i + frame_samples:4])  # 4샘플마다 하나씩만 보아도 충분
+        if best_energy is None or energy < best_energy:
+            best_pos, best_energy = start + i * 2, energy
+    return best_pos
+
+
+def get_container_sas() -> str:
+    global _CONTAINER_SAS, _CONTAINER_SAS_EXPIRY
+    with _CONTAINER_SAS_LOCK:
+        if _CONTAINER_SAS is None or _CONTAINER_SAS_EXPIRY - datetime.utcnow() < CONTAINER_SAS_MIN_REMAINING:
+            # 서명이 실패하면 이전 SAS와 만료 시각을 그대로 두어 다음 호출에서 다시 시도합니다.
+            expiry = datetime.utcnow() + CONTAINER_SAS_LIFETIME
+            signing_key = {"account_key": _ACCOUNT_KEY} if _ACCOUNT_KEY else {"user_delegation_key": get_delegation_key()}
+            _CONTAINER_SAS = generate_container_sas(account_name=_BLOB_SVC.account_name, container_name='audio-files', permission=ContainerSasPermissions(read=True), expiry=expiry, **signing_key)
+            _CONTAINER_SAS_EXPIRY = expiry
+        return _CONTAINER_SAS
+
+
+# _CONTAINER_SAS_LOCK을 잡은 상태에서 호출됩니다.
+def get_delegation_key():
+    global _DELEGATION_KEY, _DELEGATION_KEY_EXPIRY
+    if _DELEGATION_KEY is None or _DELEGATION_KEY_EXPIRY - datetime.utcnow() < timedelta(days=1):
+        start = datetime.utcnow() - timedelta(minutes=5)  # 시계 오차 허용
+        expiry = start + timedelta(days=6)
+        _DELEGATION_KEY = _BLOB_SVC.get_user_delegation_key(key_start_time=start, key_expiry_time=expiry)
+        _DELEGATION_KEY_EXPIRY = expiry
+    return _DELEGATION_KEY
+
+
+def drain_blob_deletes():
+    while True:
+        time.sleep(BLOB_DELETE_INTERVAL_SEC)
+        while _PENDING_BLOB_DELETES:
+            blob_names = []
+            while _PENDING_BLOB_DELETES and len(blob_names) < BLOB_DELETE_BATCH_SIZE:
+                blob_names.append(_PENDING_BLOB_DELETES.popleft())
+            try:
+                _BLOB_SVC.get_container_client('audio-files').delete_blobs(*blob_names, raise_on_any_failure=False)
+            except Exception as delete_e:
+                logging.warning("업로드 Blob 삭제 실패: %s", delete_e)
+
+
+if _BLOB_SVC is not None:
+    threading.Thread(target=drain_blob_deletes, name="blob-delete", daemon=True).start()
+
+
+# Blob에 업로드된 오디오 구간들로 배치 전사 작업을 제출하고, 구간별 결과를 시작 위치만큼 옮겨 하나로 합칩니다.
+def transcribe_batch(segments: list, upload_futures: list, diarize: bool, word_timestamps: bool) -> dict:
+
+    # ★★★ STT 정확도 향상을 위한 사용자 지정 어휘 추가 ★★★
+    body = {
+        "contentUrls": [sas_url for sas_url, _ in segments],
+        "locale": "ko-KR",
+        "displayName": "Advanced Transcription",
+        "properties": {
+            "wordLevelTimestampsEnabled": word_timestamps,
+            "diarizationEnabled": diarize,
+            "phrases": ";".join(CUSTOM_PHRASES)  # 인식률을 높이고 싶은 단어를 세미콜론(;)으로 구분하여 추가
+        }
+    }
+
+    # SAS URL은 로컬에서 서명되어 업로드가 끝나기 전에 이미 알고 있으므로, 남은 업로드를 기다리는 동안 작업 제출 요청을 함께 보냅니다.
+    # (Speech 서비스는 작업이 대기열에서 시작된 뒤에야 오디오를 읽어 갑니다)
+    post_future = _EXECUTOR.submit(_SESSION.post, _SPEECH_ENDPOINT, headers=_SPEECH_HEADERS, data=orjson.dumps(body), timeout=HTTP_TIMEOUT)
+    for upload_future in upload_futures:
+        upload_future.result()
+    response = post_future.result()
+    if response.status_code != 201: raise Exception(f"Speech API 오류: {response.text}")
+
+    transcription_url = response.headers['Location']
+    contents = poll_for_stt_result(transcription_url, _SPEECH_HEADERS)
+    if not contents:
+        return None
+    if len(contents) == 1 and len(segments) == 1:
+        return contents[0]
+    offsets = {sas_url.split('?')[0]: offset_ticks for sas_url, offset_ticks in segments}
+    phrases = []
+    for content in contents:
+        source = content.get("source", "").split('?')[0]
+        if source not in offsets:
+            raise Exception(f"전사 결과의 원본 파일을 찾을 수 없습니다: {source}")
+        base_ticks = offsets[source]
+        for phrase in content.get("recognizedPhrases", []):
+            shift_phrase_offsets(phrase, base_ticks)
+            phrases.append(phrase)
+    phrases.sort(key=lambda phrase: phrase.get("offsetInTicks", 0))
+    return {"recognizedPhrases": phrases}
+
+
+# 구간 결과의 문장/단어 위치(offsetInTicks와 ISO 8601 offset)를 구간 시작 위치만큼 옮깁니다.
+def shift_phrase_offsets(phrase: dict, base_ticks: int):
+    if not base_ticks:
+        return
+    for item in chain([phrase], (word for n_best in phrase.get("nBest", []) for word in n_best.get("words", []))):
+        item["offsetInTicks"] = item.get("offsetInTicks", 0) + base_ticks
+        if "offset" in item:
+            item["offset"] = ticks_to_iso_duration(item["offsetInTicks"])
+
+
+# 100ns 틱을 배치 결과와 같은 ISO 8601 기간 문자열(예: PT1M2.34S)로 바꿉니다.
+def ticks_to_iso_duration(ticks: float) -> str:
+    minutes, seconds = divmod(round(ticks / 100_000), 6000)  # 1/100초 단위
+    hours, minutes = divmod(minutes, 60)
+    return "PT" + (f"{hours}H" if hours else "") + (f"{minutes}M" if minutes else "") + f"{seconds / 100:g}S"
+
+
+def poll_for_stt_result(url: str, headers: dict) -> list:
+    # 고정 10초 대기 대신 지수 백오프(0.5초부터 1.5배씩, 최대 10초)로 폴링하여 짧은 작업은 빨리 결과를 받고,
+    # Retry-After 헤더가 있으면 그 값을 따릅니다.
+    deadline = time.monotonic() + STT_POLL_TIMEOUT_SEC
+    backoff = 0.5
+    delay = backoff
+    while time.monotonic() < deadline:
+        time.sleep(min(delay, max(0.0, deadline - time.monotonic())))
+        res = _SESSION.get(url, headers=headers, timeout=HTTP_TIMEOUT)
+        data = orjson.loads(res.content)
         status = data.get('status')
-        logging.info(f"현재 변환 상태: {status}")
+        logging.debug("현재 변환 상태: %s", status)
         if status == 'Succeeded':
-            files_url = data['links']['files']
-            files_res = requests.get(files_url, headers=headers)
-            content_url = files_res.json()['values'][0]['links']['contentUrl']
-            content_res = requests.get(content_url)
-            return content_res.json()
+            content_urls = list_transcription_files(_SESSION.get(data['links']['files'], headers=headers, timeout=HTTP_TIMEOUT), headers)
+            if not content_urls:
+                return None
+            # 결과 파일이 여러 개면 병렬로 내려받습니다.
+            return list(_EXECUTOR.map(lambda content_url: orjson.loads(_SESSION.get(content_url, timeout=HTTP_TIMEOUT).content), content_urls))
         elif status == 'Failed':
             return None
-        poll_count += 1
+        backoff = min(backoff * 1.5, 10.0)
+        delay = backoff
+        retry_after = res.headers.get("Retry-After")
+        if retry_after:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                pass
     return None
+
+
+# 결과 파일 목록은 페이지로 나뉘어 오므로 @nextLink를 끝까지 따라가며 전사 결과 파일 URL을 모읍니다.
+def list_transcription_files(files_res: requests.Response, headers: dict) -> list:
+    content_urls = []
+    while True:
+        page = orjson.loads(files_res.content)
+        content_urls += [v['links']['contentUrl'] for v in page['values'] if v.get('kind') == 'Transcription']
+        next_link = page.get('@nextLink')
+        if not next_link:
+            return content_urls
+        files_res = _SESSION.get(next_link, headers=headers, timeout=HTTP_TIMEOUT)